@@ -1,15 +1,23 @@
 import os
 import re
-import json
-import difflib
+import copy
+import math
+import bisect
+import datetime
+import asyncio
+import functools
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, RedirectResponse, HTMLResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse, HTMLResponse
 
-import dateparser
+import orjson
+from dateparser.date import DateDataParser
+from rapidfuzz import process, fuzz
 
 # Excel I/O helpers (for excel_io.py)
 from excel_io import (
@@ -19,6 +27,8 @@ from excel_io import (
     append_booking,
     within_hours,
     ensure_workbook_with_doctors,
+    flush_workbook,
+    FILE as EXCEL_FILE,
 )
 
 # Optional: readback for /api/bookings
@@ -29,10 +39,27 @@ load_dotenv()
 BRAND = os.getenv("BRAND_NAME", "Demo Dental Clinic")
 TZ = os.getenv("TZ", "UTC")
 
-from openai import OpenAI
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+import httpx
+from openai import AsyncOpenAI
+# One pooled HTTP/2 client shared by all requests: concurrent /nlu calls
+# multiplex over kept-alive connections instead of paying a TLS/TCP
+# handshake each time.
+client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    http_client=httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    ),
+)
 
-app = FastAPI()
+# Ensure the Excel file exists once at startup (won't overwrite if present)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ensure_workbook_with_doctors()
+    yield
+    flush_workbook()  # persist any debounced Excel appends on shutdown
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS so the browser frontend can call APIs locally
 app.add_middleware(
@@ -47,27 +74,61 @@ app.mount("/static", StaticFiles(directory="static", html=True), name="static")
 async def root():
     return RedirectResponse(url="/static/")
 
-# Ensure the Excel file exists once at startup (won't overwrite if present)
-@app.on_event("startup")
-def _init_file():
-    ensure_workbook_with_doctors()
-
 # List doctors (fed to the frontend and NLU)
 @app.get("/api/doctors")
 def api_doctors():
     return {"doctors": list_doctors()}
 
+# Compiled once: these run per request (and per doctor name), so don't pay
+# re's cache lookup each call.
+_RE_DR = re.compile(r"\bdr\.?\b")
+_RE_NONALPHA = re.compile(r"[^a-z0-9\s]")
+_RE_WS = re.compile(r"\s+")
+_RE_NAME = re.compile(r"[^a-zA-Z\s\-]")
+_RE_DIGITS = re.compile(r"\D")
+
 def _norm(s: str) -> str:
     if not s:
         return ""
-    s = s.lower()
-    s = re.sub(r"\bdr\.?\b", "", s)       # remove 'dr' / 'dr.'
-    s = re.sub(r"[^a-z0-9\s]", " ", s)    # drop punctuation
-    return re.sub(r"\s+", " ", s).strip()
+    s = s.casefold()
+    s = _RE_DR.sub("", s)          # remove 'dr' / 'dr.'
+    s = _RE_NONALPHA.sub(" ", s)   # drop punctuation
+    return _RE_WS.sub(" ", s).strip()
 
 def _tokens(s: str):
     return _norm(s).split()
 
+@functools.lru_cache(maxsize=1)
+def _doctor_index(doctors: tuple) -> tuple:
+    """Roster tokens as parallel sorted arrays (tokens + owning doctor).
+
+    Built once per roster (the lru_cache key is the doctors tuple, so a
+    new sheet automatically triggers a rebuild). Because the tokens are
+    sorted, every doctor token starting with a user token sits in one
+    contiguous range: a bisect plus a short forward walk replaces the
+    full startswith scan.
+    """
+    pairs = sorted(
+        (t, i) for i, doc in enumerate(doctors) for t in set(_tokens(doc))
+    )
+    sorted_tokens = [t for t, _ in pairs]
+    owners = [i for _, i in pairs]
+    return sorted_tokens, owners
+
+def _match_doctors(doctors: tuple, user_tok: str) -> set:
+    """Doctors whose name has a token starting with user_tok."""
+    sorted_tokens, owners = _doctor_index(doctors)
+    hits = set()
+    i = bisect.bisect_left(sorted_tokens, user_tok)
+    while i < len(sorted_tokens) and sorted_tokens[i].startswith(user_tok):
+        hits.add(doctors[owners[i]])
+        i += 1
+    return hits
+
+@functools.lru_cache(maxsize=1)
+def _normalized_doctors(doctors: tuple) -> list:
+    return [_norm(d) for d in doctors]
+
 def choose_doctor(user_text: str):
     """
     Return (canonical, None) if confident;
@@ -82,13 +143,7 @@ def choose_doctor(user_text: str):
     if not user_text:
         return None, None
 
-    options = list_doctors()
-
-    # Build token -> doctors map
-    tok2docs = {}
-    for doc in options:
-        for t in _tokens(doc):
-            tok2docs.setdefault(t, set()).add(doc)
+    options = tuple(list_doctors())
 
     # User tokens (ignore super short tokens)
     user_toks = [t for t in _tokens(user_text) if len(t) >= 3]
@@ -97,8 +152,7 @@ def choose_doctor(user_text: str):
         matches = set()
         for ut in user_toks:
             # any doctor token starting with user token
-            hits = {doc for tok, docs in tok2docs.items() if tok.startswith(ut) for doc in docs}
-            matches |= hits
+            matches |= _match_doctors(options, ut)
 
         if len(matches) == 1:
             return next(iter(matches)), None
@@ -108,20 +162,26 @@ def choose_doctor(user_text: str):
 
     # fallback: close full-string match (conservative to avoid wrong guesses)
     nu = _norm(user_text)
-    scored = [(difflib.SequenceMatcher(None, nu, _norm(doc)).ratio(), doc) for doc in options]
-    scored.sort(reverse=True)
-    best, name = scored[0]
-    if best >= 0.72:
-        return name, None
+    match = process.extractOne(
+        nu,
+        _normalized_doctors(tuple(options)),
+        scorer=fuzz.ratio,
+        score_cutoff=72,
+    )
+    if match is not None:
+        return options[match[2]], None
 
     return None, None
 
 SYSTEM_PROMPT = """
 You are a friendly, concise receptionist for a dental clinic.
 Your job is to collect exactly 6 fields: doctor, name, phone, service, date, time.
-ALWAYS ask for the DOCTOR first. The list of valid doctors will be provided in the user message.
+ALWAYS ask for the DOCTOR first. The list of valid doctors appears at the end of this message.
 Keep responses short (≤15 words), one question at a time.
 
+Each user message is a JSON object:
+{"filled": {...fields collected so far...}, "user_text": "the caller's latest utterance"}
+
 Output format (STRICT): respond with pure JSON only (no extra text):
 {
   "filled": {"doctor":"", "name":"", "phone":"", "service":"", "date_text":"", "time_text":""},
@@ -149,29 +209,80 @@ Behavior:
 - Never include anything except the JSON object described above.
 """
 
+@functools.lru_cache(maxsize=1)
+def _system_prompt(doctors: tuple) -> str:
+    """System message with the roster appended after the static instructions.
+
+    Kept byte-identical across turns (the roster only changes when a sheet
+    is added) so the provider's prompt cache can reuse the shared prefix;
+    per-turn state goes in the user message instead.
+    """
+    return SYSTEM_PROMPT + "\nValid doctors: " + ", ".join(doctors) + "\n"
+
 # Utils
 def clean_name(s: str) -> str:
     if not s: return ""
-    s = re.sub(r"[^a-zA-Z\s\-]", "", s)  # keep only letters, spaces, hyphens, and capitalize nicely
+    s = _RE_NAME.sub("", s)  # keep only letters, spaces, hyphens, and capitalize nicely
     return s.strip().title()
 
 def clean_phone(s: str) -> str:
-    digits = re.sub(r"\D", "", s or "")
+    digits = _RE_DIGITS.sub("", s or "")
     return digits if len(digits) >= 8 else ""
 
+# dateparser tries many locales per call; pin English and reuse one parser.
+# Callers only want future appointment slots, so prefer future readings of
+# ambiguous dates like "friday".
+_DDP = DateDataParser(
+    languages=["en"],
+    settings={
+        "TIMEZONE": TZ,
+        "RETURN_AS_TIMEZONE_AWARE": False,
+        "PREFER_DATES_FROM": "future",
+    },
+)
+
+# Fast paths for the most common shapes: ISO dates and plain clock times
+# skip dateparser entirely.
+_RE_ISO_DATE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+_RE_HHMM = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)$")
+_RE_AMPM = re.compile(r"^(\d{1,2})(?::([0-5]\d))?\s*(am|pm)$", re.I)
+
+def _fast_time(s: str):
+    m = _RE_HHMM.match(s)
+    if m:
+        return f"{int(m.group(1)):02d}:{m.group(2)}"
+    m = _RE_AMPM.match(s)
+    if m:
+        h = int(m.group(1))
+        if not 1 <= h <= 12:
+            return None  # "13 pm" etc.: let the full parser decide
+        h %= 12
+        if m.group(3).lower() == "pm":
+            h += 12
+        return f"{h:02d}:{m.group(2) or '00'}"
+    return None
+
 def normalize(date_text: str, time_text: str, tz_name: str):
     """Return (YYYY-MM-DD, HH:MM) or (None, None) if unparseable."""
     try:
-        dt = dateparser.parse(
-            f"{date_text} {time_text}",
-            settings={"TIMEZONE": tz_name, "RETURN_AS_TIMEZONE_AWARE": False},
-        )
+        d = (date_text or "").strip()
+        t = _fast_time((time_text or "").strip())
+        m = _RE_ISO_DATE.match(d) if t else None
+        if m:
+            try:
+                datetime.date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+                return d, t
+            except ValueError:
+                pass  # calendar-impossible (e.g. 2025-02-30): let the parser decide
+        dt = _DDP.get_date_data(f"{date_text} {time_text}").date_obj
         if not dt:
             return None, None
         return dt.strftime("%Y-%m-%d"), dt.strftime("%H:%M")
     except Exception:
         return None, None
 
+FIELDS = ["doctor", "name", "phone", "service", "date_text", "time_text"]
+
 def next_missing_question(filled: dict) -> str:
     order = [
         ("doctor", "Which doctor would you like to book with?"),
@@ -187,6 +298,84 @@ def next_missing_question(filled: dict) -> str:
             return q
     return "Great—shall I proceed to book this appointment?"
 
+# Deterministic fast path for /nlu: trivial turns (resume words, a bare
+# phone number, a bare doctor name) skip the model round-trip entirely.
+_RE_RESUME = re.compile(r"^(hi|hello|hey|i'?m ready|ready|continue|go)[.!]?$", re.I)
+_RE_PHONE_ONLY = re.compile(
+    r"[\d\s\-+().,]|zero|one|two|three|four|five|six|seven|eight|nine|oh|double"
+)
+
+def _rule_reply(filled: dict) -> dict:
+    ready = all((filled.get(k) or "").strip() for k in FIELDS)
+    return {
+        "filled": filled,
+        "next_question": next_missing_question(filled),
+        "ready": ready,
+    }
+
+def _rule_based_nlu(filled: dict, user_text: str):
+    """Handle trivial turns without the LLM. Returns a reply dict or None."""
+    text = user_text.strip()
+    if not text:
+        return None
+
+    # resume / hold words never change any field
+    if _RE_RESUME.match(text):
+        return _rule_reply(dict(filled))
+
+    # anything that parses as a date/time may carry several fields — defer
+    # (pinned parser: the bare dateparser.parse tries every locale and
+    # blocks the event loop for milliseconds per probe)
+    if _DDP.get_date_data(text).date_obj is not None:
+        return None
+
+    # utterance that is nothing but a phone number
+    if not (filled.get("phone") or "").strip():
+        digits = clean_phone(text)
+        if digits and not _RE_PHONE_ONLY.sub("", text.lower()).strip():
+            new = dict(filled)
+            new["phone"] = digits
+            return _rule_reply(new)
+
+    # utterance that is nothing but a (unique) doctor reference
+    if not (filled.get("doctor") or "").strip():
+        canon, ambiguous = choose_doctor(text)
+        if canon and not ambiguous:
+            canon_toks = set(_tokens(canon))
+            if all(any(ct.startswith(ut) for ct in canon_toks) for ut in _tokens(text)):
+                new = dict(filled)
+                new["doctor"] = canon
+                return _rule_reply(new)
+
+    return None
+
+# /nlu response caches. Repeated turns like "hello" / "I'm ready" / a doctor
+# name hit the exact tier; near-identical phrasings hit the semantic tier.
+# Keys always include the filled fields so a hit can't answer the wrong
+# point in the conversation.
+_NLU_CACHE: "OrderedDict[tuple, dict]" = OrderedDict()
+_NLU_CACHE_MAX = 4096
+_SEM_CACHE: list = []          # (filled_key, embedding, model reply)
+_SEM_CACHE_MAX = 256
+_SEM_THRESHOLD = 0.92          # conservative: prefer a miss over a wrong hit
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    na = math.sqrt(sum(x * x for x in a))
+    nb = math.sqrt(sum(x * x for x in b))
+    if not na or not nb:
+        return 0.0
+    return dot / (na * nb)
+
+async def _embed(text: str):
+    try:
+        resp = await client.embeddings.create(
+            model="text-embedding-3-small", input=text
+        )
+        return resp.data[0].embedding
+    except Exception:
+        return None
+
 # NLU
 @app.post("/nlu")
 async def nlu(req: Request):
@@ -194,35 +383,75 @@ async def nlu(req: Request):
     body = await req.json()
     filled = body.get("filled", {}) or {}
     user_text = body.get("user_text", "") or ""
-    doctors = list_doctors()
+    doctors = await asyncio.to_thread(list_doctors)
 
     # sanitize existing phone
     filled["phone"] = clean_phone(filled.get("phone", ""))
 
-    prompt_user = (
-        f"Valid doctors list: {doctors}\n"
-        f"Current filled fields: {json.dumps(filled)}\n"
-        f'User said: "{user_text}"\n'
-        f"Return JSON as specified."
-    )
-
-    try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.1,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt_user},
-            ],
-        )
-        raw = (resp.choices[0].message.content or "").strip()
-        data = json.loads(raw)
-    except Exception:
-        data = {
-            "filled": filled,
-            "next_question": "Sorry, could you repeat that?",
-            "ready": False,
-        }
+    # Deterministic turns don't need the model at all
+    shortcut = _rule_based_nlu(filled, user_text)
+    if shortcut is not None:
+        return ORJSONResponse(shortcut)
+
+    # Volatile state lives in the user message; the system message stays
+    # byte-stable so the provider can cache its prefill.
+    prompt_user = orjson.dumps({"filled": filled, "user_text": user_text}).decode()
+
+    filled_key = orjson.dumps(filled, option=orjson.OPT_SORT_KEYS)
+    text_key = user_text.strip().lower()
+    cache_key = (filled_key, text_key, tuple(doctors))
+    # A half-filled doctor means the next turn is a clarification; caching
+    # those could replay a stale "did you mean ...?" answer.
+    cacheable = not (filled.get("doctor") and not doctor_exists(filled["doctor"]))
+
+    data = None
+    vec = None
+    if cacheable:
+        hit = _NLU_CACHE.get(cache_key)
+        if hit is not None:
+            _NLU_CACHE.move_to_end(cache_key)
+            data = copy.deepcopy(hit)
+        else:
+            # semantic tier: same filled context, near-identical wording
+            vec = await _embed(text_key)
+            if vec is not None:
+                for fk, v, cached in _SEM_CACHE:
+                    if fk == filled_key and _cosine(vec, v) >= _SEM_THRESHOLD:
+                        data = copy.deepcopy(cached)
+                        break
+
+    if data is None:
+        try:
+            resp = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                temperature=0,
+                max_tokens=120,  # the reply JSON is tiny
+                response_format={"type": "json_object"},
+                messages=[
+                    {"role": "system", "content": _system_prompt(tuple(doctors))},
+                    {"role": "user", "content": prompt_user},
+                ],
+            )
+            # json_object mode guarantees parseable JSON, not our schema:
+            # empty content or a reply without "filled" takes the repair
+            # path below instead of crashing (and is never cached).
+            data = orjson.loads(resp.choices[0].message.content or "")
+            if "filled" not in data:
+                raise ValueError("model reply missing 'filled'")
+            if cacheable:
+                _NLU_CACHE[cache_key] = copy.deepcopy(data)
+                if len(_NLU_CACHE) > _NLU_CACHE_MAX:
+                    _NLU_CACHE.popitem(last=False)
+                if vec is not None:
+                    _SEM_CACHE.append((filled_key, vec, copy.deepcopy(data)))
+                    if len(_SEM_CACHE) > _SEM_CACHE_MAX:
+                        _SEM_CACHE.pop(0)
+        except Exception:
+            data = {
+                "filled": filled,
+                "next_question": "Sorry, could you repeat that?",
+                "ready": False,
+            }
 
     # sanitize patient name again
     if "filled" in data and data["filled"].get("name"):
@@ -242,7 +471,7 @@ async def nlu(req: Request):
             data["filled"]["doctor"] = ""
             data["ready"] = False
             data["next_question"] = f"Did you mean {ambiguous[0]} or {ambiguous[1]}?"
-            return JSONResponse(data)  # wait for clarification
+            return ORJSONResponse(data)  # wait for clarification
 
     # Final guard: reprompt if still invalid
     doc = (data.get("filled", {}) or {}).get("doctor", "")
@@ -253,7 +482,7 @@ async def nlu(req: Request):
             f"Sorry, that doctor is not in our clinic. "
             f"Available doctors: {', '.join(doctors)}. Which doctor would you like?"
         )
-        return JSONResponse(data)
+        return ORJSONResponse(data)
 
     # Phone must be >=8 digits; otherwise clear it and reprompt
     if (data.get("filled") or {}).get("phone"):
@@ -261,24 +490,22 @@ async def nlu(req: Request):
             data["filled"]["phone"] = ""
             data["ready"] = False
             data["next_question"] = "Please say your phone number with at least 8 digits."
-            return JSONResponse(data)
+            return ORJSONResponse(data)
 
     # Choose the next missing field deterministically
     data["next_question"] = next_missing_question(data.get("filled", {}))
-    all_ok = all((data["filled"].get(k) or "").strip() for k in ["doctor","name","phone","service","date_text","time_text"])
+    all_ok = all((data["filled"].get(k) or "").strip() for k in FIELDS)
     data["ready"] = bool(all_ok)
 
-    return JSONResponse(data)
+    return ORJSONResponse(data)
 
 
 # Booking checks & writing
-@app.post("/check")
-async def check(req: Request):
-    body = await req.json()
-    doctor_raw = (body.get("doctor") or "").strip()
-    date_text = (body.get("date_text") or "").strip()
-    time_text = (body.get("time_text") or "").strip()
-
+async def _validate_slot(doctor_raw: str, date_text: str, time_text: str) -> dict:
+    """Shared validation for /check and /book: resolve the doctor, parse the
+    date/time, and verify hours and availability. Returns the /check
+    response shape; on success the canonical doctor rides along under
+    "doctor"."""
     canon, ambiguous = choose_doctor(doctor_raw) if doctor_raw else (None, None)
     if ambiguous:
         return {
@@ -310,17 +537,36 @@ async def check(req: Request):
             "message": "Our doctors are available 14:00 to 23:59. Please choose a time in that range.",
         }
 
-    if not slot_available(doctor, date_str, time_str):
+    if not await asyncio.to_thread(slot_available, doctor, date_str, time_str):
         return {
             "ok": False,
             "reason": "overlap",
             "message": "That time is already booked. Please choose another time or another date.",
         }
 
-    return {"ok": True, "date": date_str, "time": time_str}
+    return {"ok": True, "doctor": doctor, "date": date_str, "time": time_str}
+
+@app.post("/check")
+async def check(req: Request):
+    """Thin wrapper kept for backward compat; /book?dry_run=true is the
+    same validation in one round-trip."""
+    body = await req.json()
+    result = await _validate_slot(
+        (body.get("doctor") or "").strip(),
+        (body.get("date_text") or "").strip(),
+        (body.get("time_text") or "").strip(),
+    )
+    if result.get("ok"):
+        return {"ok": True, "date": result["date"], "time": result["time"]}
+    return result
+
+# slot_available followed by append_booking is not atomic; two concurrent
+# /book calls for the same slot could both pass the check. Serialize the
+# validate+append pair per doctor.
+_BOOK_LOCKS: dict = defaultdict(asyncio.Lock)
 
 @app.post("/book")
-async def book(req: Request):
+async def book(req: Request, dry_run: bool = False):
     body = await req.json()
     doctor_raw = (body.get("doctor") or "").strip()
     name = (body.get("name") or "").strip()
@@ -329,67 +575,63 @@ async def book(req: Request):
     date_text = (body.get("date_text") or "").strip()
     time_text = (body.get("time_text") or "").strip()
 
-    canon, ambiguous = choose_doctor(doctor_raw) if doctor_raw else (None, None)
-    if ambiguous:
-        return JSONResponse({"ok": False, "message": f"Did you mean {ambiguous[0]} or {ambiguous[1]}?"}, status_code=400)
-    doctor = canon or doctor_raw
-
-    if not doctor_exists(doctor):
-        return JSONResponse(
-            {"ok": False, "message": f"Doctor not found. Available: {', '.join(list_doctors())}"},
-            status_code=400,
-        )
-
-    date_str, time_str = normalize(date_text, time_text, TZ)
-    if not date_str or not time_str:
-        return JSONResponse({"ok": False, "message": "Invalid date/time."}, status_code=400)
-
-    if not within_hours(time_str):
-        return JSONResponse(
-            {"ok": False, "message": "Doctors are available 14:00–23:59 only."},
-            status_code=400,
-        )
-
-    if not slot_available(doctor, date_str, time_str):
-        return JSONResponse(
-            {"ok": False, "message": "That time is already booked. Please choose another."},
-            status_code=409,
+    if dry_run:
+        result = await _validate_slot(doctor_raw, date_text, time_text)
+        if not result.get("ok"):
+            return result  # /check response shape
+        return {"ok": True, "date": result["date"], "time": result["time"]}
+
+    canon, _ = choose_doctor(doctor_raw) if doctor_raw else (None, None)
+    async with _BOOK_LOCKS[canon or doctor_raw]:
+        result = await _validate_slot(doctor_raw, date_text, time_text)
+        if not result.get("ok"):
+            status = 409 if result.get("reason") == "overlap" else 400
+            return ORJSONResponse({"ok": False, "message": result["message"]}, status_code=status)
+
+        doctor, date_str, time_str = result["doctor"], result["date"], result["time"]
+
+        # Append to doctor's sheet (blocking save, so keep it off the event loop)
+        await asyncio.to_thread(
+            append_booking,
+            doctor,
+            {
+                "date": date_str,
+                "time": time_str,
+                "patient_name": name,
+                "service": service,
+                "phone": phone,
+                "status": "confirmed",
+            },
         )
-
-    # Append to doctor's sheet
-    append_booking(
-        doctor,
-        {
-            "date": date_str,
-            "time": time_str,
-            "patient_name": name,
-            "service": service,
-            "phone": phone,
-            "status": "confirmed",
-        },
-    )
     return {"ok": True, "message": f"Booked with {doctor} on {date_str} at {time_str}."}
 
 # View bookings in browser
 @app.get("/api/bookings")
 def api_bookings(doctor: str = "", date: str = ""):
     """Quick way to inspect rows without opening Excel."""
-    from excel_io import FILE  # use the same path as excel_io
-    f = Path(FILE)
+    flush_workbook()  # make sure the export includes recent bookings
+    f = Path(EXCEL_FILE)
     if not f.exists():
         return {"rows": []}
 
-    wb = load_workbook(f)
+    # read_only streams rows and skips styles/dimensions entirely
+    wb = load_workbook(f, read_only=True, data_only=True)
     sheets = [doctor] if doctor and doctor in wb.sheetnames else wb.sheetnames
 
     all_rows = []
     for sh in sheets:
-        ws = wb[sh]
-        headers = [c.value for c in ws[1]]
-        for r in ws.iter_rows(min_row=2, values_only=True):
+        rows = wb[sh].iter_rows(values_only=True)
+        headers = next(rows, None)
+        if not headers:
+            continue
+        headers = list(headers)
+        date_idx = headers.index("date") if "date" in headers else None
+        for r in rows:
+            # filter on the raw tuple before paying for the dict build
+            if date and date_idx is not None and str(r[date_idx]) != date:
+                continue
             row = dict(zip(headers, r))
             row["doctor"] = sh
-            if date and str(row.get("date")) != date:
-                continue
             all_rows.append(row)
+    wb.close()
     return {"rows": all_rows}
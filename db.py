@@ -0,0 +1,67 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DB_FILE = Path("bookings.db")
+
+# One process-wide connection. WAL lets readers run while a write commits,
+# and synchronous=NORMAL is durable enough for an appointment log.
+_CONN: Optional[sqlite3.Connection] = None
+_CONN_LOCK = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings(
+    doctor TEXT, date TEXT, time TEXT,
+    patient TEXT, service TEXT, phone TEXT, status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_slot ON bookings(doctor, date, time);
+"""
+
+def connect() -> sqlite3.Connection:
+    """Open the shared SQLite handle (once), creating schema if needed."""
+    global _CONN
+    if _CONN is None:
+        with _CONN_LOCK:
+            if _CONN is None:
+                conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(_SCHEMA)
+                _CONN = conn
+    return _CONN
+
+def is_empty() -> bool:
+    cur = connect().execute("SELECT 1 FROM bookings LIMIT 1")
+    return cur.fetchone() is None
+
+def times_for(doctor: str, date_str: str) -> List[str]:
+    """Booked start times for one doctor on one day (usually a handful)."""
+    cur = connect().execute(
+        "SELECT time FROM bookings WHERE doctor=? AND date=?",
+        (doctor, date_str),
+    )
+    return [r[0] for r in cur.fetchall()]
+
+def all_slots() -> List[Tuple[str, str, str]]:
+    """Every (doctor, date, time) triple — used to seed the slot index."""
+    cur = connect().execute("SELECT doctor, date, time FROM bookings")
+    return cur.fetchall()
+
+def insert_booking(doctor: str, row: Dict):
+    conn = connect()
+    with _CONN_LOCK:
+        conn.execute(
+            "INSERT INTO bookings(doctor, date, time, patient, service, phone, status)"
+            " VALUES (?,?,?,?,?,?,?)",
+            (
+                doctor,
+                row.get("date", ""),
+                row.get("time", ""),
+                row.get("patient_name", ""),
+                row.get("service", ""),
+                row.get("phone", ""),
+                row.get("status", "confirmed"),
+            ),
+        )
+        conn.commit()
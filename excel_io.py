@@ -1,41 +1,127 @@
+import time
+import bisect
+import threading
+
 from openpyxl import Workbook, load_workbook
 from pathlib import Path
-from typing import Dict, List, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import db
 
 FILE = Path("bookings_dentist.xlsx")   # new filename to keep things clean
 HEADERS = ["date", "time", "patient_name", "service", "phone", "status"]
-DOCTORS = ["Dr. Jesan Ahmed", "Dr. Hasan Rahman", "Dr. Gregory House"] 
+DOCTORS = ["Dr. Jesan Ahmed", "Dr. Hasan Rahman", "Dr. Gregory House"]
+
+# The roster only changes when a sheet is added, so cache it instead of
+# re-parsing the whole .xlsx just to read wb.sheetnames on every request.
+_DOCTORS_CACHE: Optional[List[str]] = None
+_DOCTORS_SET: frozenset = frozenset()
+
+# Long-lived workbook handle: load_workbook() unzips and parses the whole
+# .xlsx, so do it once per process instead of once per request. Writes are
+# serialized with a lock because FastAPI runs sync routes on a threadpool.
+_WB: Optional[Workbook] = None
+_WB_LOCK = threading.Lock()
+
+# wb.save() rewrites the whole .xlsx, so don't pay it per booking. SQLite
+# is the durable store; the workbook is an export that we save at most
+# every _SAVE_INTERVAL seconds, plus on demand (flush_workbook) and at
+# shutdown.
+_SAVE_INTERVAL = 5.0
+_DIRTY = False
+_LAST_SAVE = 0.0
+
+def flush_workbook():
+    """Write any pending appended rows out to the .xlsx export."""
+    global _DIRTY, _LAST_SAVE
+    if _WB is None or not _DIRTY:
+        return
+    with _WB_LOCK:
+        if not _DIRTY:
+            return
+        _WB.save(FILE)
+        _DIRTY = False
+        _LAST_SAVE = time.monotonic()
+
+def invalidate_doctors_cache():
+    """Drop the cached roster; next list_doctors() rebuilds it."""
+    global _DOCTORS_CACHE, _DOCTORS_SET
+    _DOCTORS_CACHE = None
+    _DOCTORS_SET = frozenset()
 
 def ensure_workbook_with_doctors():
-    """Create workbook with one worksheet per doctor if missing."""
-    if FILE.exists():
+    """Create the workbook if missing and open the long-lived handle.
+
+    One-time init: _WB doubles as the done-flag, so after the startup
+    hook has run this is a single attribute check with no stat() call.
+    """
+    global _WB
+    if _WB is not None:
         return
-    wb = Workbook()
-    # first sheet
-    ws = wb.active
-    ws.title = DOCTORS[0]
-    ws.append(HEADERS)
-    # rest
-    for name in DOCTORS[1:]:
-        ws2 = wb.create_sheet(title=name)
-        ws2.append(HEADERS)
-    wb.save(FILE)
+    with _WB_LOCK:
+        if _WB is not None:
+            return
+        if FILE.exists():
+            _WB = load_workbook(FILE)
+            _seed_db_from_workbook(_WB)
+            return
+        wb = Workbook()
+        # first sheet
+        ws = wb.active
+        ws.title = DOCTORS[0]
+        ws.append(HEADERS)
+        # rest
+        for name in DOCTORS[1:]:
+            ws2 = wb.create_sheet(title=name)
+            ws2.append(HEADERS)
+        wb.save(FILE)
+        _WB = wb
+        invalidate_doctors_cache()
+        db.connect()  # create the empty bookings table alongside
 
-def list_doctors() -> List[str]:
+def _seed_db_from_workbook(wb: Workbook):
+    """One-time migration: copy any pre-existing Excel rows into SQLite."""
+    if not db.is_empty():
+        return
+    for name in wb.sheetnames:
+        ws = wb[name]
+        for r in ws.iter_rows(min_row=2, values_only=True):
+            if not r or r[0] is None:
+                continue
+            d, t, patient, service, phone, status = (list(r) + [""] * 6)[:6]
+            db.insert_booking(name, {
+                "date": str(d),
+                "time": str(t),
+                "patient_name": patient or "",
+                "service": service or "",
+                "phone": str(phone or ""),
+                "status": status or "confirmed",
+            })
+
+def _workbook() -> Workbook:
     ensure_workbook_with_doctors()
-    wb = load_workbook(FILE)
-    return wb.sheetnames
+    return _WB
+
+def list_doctors() -> List[str]:
+    global _DOCTORS_CACHE, _DOCTORS_SET
+    if _DOCTORS_CACHE is None:
+        _DOCTORS_CACHE = list(_workbook().sheetnames)
+        _DOCTORS_SET = frozenset(_DOCTORS_CACHE)
+    return _DOCTORS_CACHE
+
+# Working hours as minutes since midnight; plain int math beats strptime
+# on every overlap/hours check.
+_T_OPEN = 14 * 60        # 14:00
+_T_CLOSE = 23 * 60 + 59  # 23:59
 
-def _parse_hhmm(s: str) -> datetime:
-    return datetime.strptime(s, "%H:%M")
+def _to_min(s: str) -> int:
+    h, m = s.split(":")
+    return int(h) * 60 + int(m)
 
 def _overlaps(t1: str, t2: str) -> bool:
     """Returns True if start times are less than 60 mins apart (1-hour slots)."""
     try:
-        a = _parse_hhmm(t1)
-        b = _parse_hhmm(t2)
-        return abs((a - b).total_seconds()) < 60*60
+        return abs(_to_min(t1) - _to_min(t2)) < 60
     except Exception:
         # fall back to strict equality if parse fails
         return t1 == t2
@@ -43,42 +129,92 @@ def _overlaps(t1: str, t2: str) -> bool:
 def within_hours(time_str: str) -> bool:
     """Working hours: 14:00–23:59 inclusive."""
     try:
-        t = _parse_hhmm(time_str)
-        return _parse_hhmm("14:00") <= t <= _parse_hhmm("23:59")
+        return _T_OPEN <= _to_min(time_str) <= _T_CLOSE
     except Exception:
         return False
 
 def doctor_exists(name: str) -> bool:
-    return name in list_doctors()
+    list_doctors()  # populate cache if needed
+    return name in _DOCTORS_SET
+
+# (doctor, date) -> sorted booking start times in minutes. Mirrors the
+# SQLite rows so the hot-path overlap check is two neighbor comparisons
+# instead of a per-row scan or query.
+_SLOT_INDEX: Optional[Dict[Tuple[str, str], List[int]]] = None
+_SLOT_INDEX_LOCK = threading.Lock()
+
+def _slot_index() -> Dict[Tuple[str, str], List[int]]:
+    global _SLOT_INDEX
+    if _SLOT_INDEX is None:
+        # Double-checked: a first /check racing a first /book must not
+        # both build, or the loser's pre-insert snapshot could overwrite
+        # the winner's index and hide a fresh booking.
+        with _SLOT_INDEX_LOCK:
+            if _SLOT_INDEX is None:
+                # callers have already gone through _workbook() or
+                # doctor_exists(), so init (and the one-time db seed)
+                # is guaranteed by now
+                idx: Dict[Tuple[str, str], List[int]] = {}
+                for doc, d, t in db.all_slots():
+                    try:
+                        m = _to_min(str(t))
+                    except Exception:
+                        continue  # unparseable times fall back to the db check
+                    bisect.insort(idx.setdefault((doc, str(d)), []), m)
+                _SLOT_INDEX = idx
+    return _SLOT_INDEX
 
 def slot_available(doctor: str, date_str: str, time_str: str) -> bool:
     """True if no overlapping appointment for that doctor/date/time."""
-    ensure_workbook_with_doctors()
-    wb = load_workbook(FILE)
-    if doctor not in wb.sheetnames:
+    if not doctor_exists(doctor):
+        return False
+    try:
+        m = _to_min(time_str)
+    except Exception:
+        # unparseable request time: scan the (tiny) same-day rows instead
+        return not any(_overlaps(str(t), time_str) for t in db.times_for(doctor, date_str))
+    arr = _slot_index().get((doctor, date_str))
+    if not arr:
+        return True
+    # only the nearest neighbors can be within 60 minutes
+    i = bisect.bisect_left(arr, m)
+    if i > 0 and m - arr[i - 1] < 60:
+        return False
+    if i < len(arr) and arr[i] - m < 60:
         return False
-    ws = wb[doctor]
-    for r in ws.iter_rows(min_row=2, values_only=True):
-        d, t, *_ = r
-        if str(d) == date_str and _overlaps(str(t), time_str):
-            return False
     return True
 
 def append_booking(doctor: str, row: Dict):
-    """Write a new row to the doctor's sheet. Creates workbook if needed."""
-    ensure_workbook_with_doctors()
-    wb = load_workbook(FILE)
-    if doctor not in wb.sheetnames:
-        # if doctor missing, create sheet with headers (you can also forbid this)
-        ws = wb.create_sheet(title=doctor)
-        ws.append(HEADERS)
-    ws = wb[doctor]
-    ws.append([
-        row.get("date",""),
-        row.get("time",""),
-        row.get("patient_name",""),
-        row.get("service",""),
-        row.get("phone",""),
-        row.get("status","confirmed")
-    ])
-    wb.save(FILE)
\ No newline at end of file
+    """Record a booking in SQLite and append to the doctor's sheet.
+
+    The sheet append is in-memory only; the .xlsx save is debounced since
+    SQLite already made the booking durable.
+    """
+    global _DIRTY
+    wb = _workbook()  # init first so a fresh process seeds the db before writing
+    db.insert_booking(doctor, row)
+    try:
+        bisect.insort(
+            _slot_index().setdefault((doctor, row.get("date", "")), []),
+            _to_min(str(row.get("time", ""))),
+        )
+    except Exception:
+        pass  # unparseable time: db.times_for still covers it
+    with _WB_LOCK:
+        if doctor not in wb.sheetnames:
+            # if doctor missing, create sheet with headers (you can also forbid this)
+            ws = wb.create_sheet(title=doctor)
+            ws.append(HEADERS)
+            invalidate_doctors_cache()
+        ws = wb[doctor]
+        ws.append([
+            row.get("date",""),
+            row.get("time",""),
+            row.get("patient_name",""),
+            row.get("service",""),
+            row.get("phone",""),
+            row.get("status","confirmed")
+        ])
+        _DIRTY = True
+    if time.monotonic() - _LAST_SAVE >= _SAVE_INTERVAL:
+        flush_workbook()
\ No newline at end of file